@@ -1,40 +1,101 @@
 """Download images from pexels.com."""
 
 import argparse
+import asyncio
 import io
 import os
 
-import requests
+import aiohttp
 from PIL import Image
 
+try:
+    from turbojpeg import TJPF_GRAY, TJSAMP_GRAY, TurboJPEG
+
+    turbo_jpeg = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    # PyTurboJPEG or the libjpeg-turbo library is not available
+    turbo_jpeg = None
+
 API_URL = "https://api.pexels.com/v1/search"
 HEADERS = {"User-Agent": "Gramps Faker 1.0"}
+MAX_CONNECTIONS = 16
 
 API_KEY = os.getenv("PEXELS_API_KEY")
 
 
-def fetch_images(query: str, num: int = 100):
-    """Fetch num images matching the query. Returns a generator."""
+async def fetch_photo_urls(
+    session: aiohttp.ClientSession, query: str, num: int = 100
+) -> list[str]:
+    """Fetch the URLs of num images matching the query."""
     URL = f"{API_URL}?query={query}&per_page={num}"
     headers = {"Authorization": f"{API_KEY}"}
-    response = requests.get(URL, headers=headers)
-    response.raise_for_status()
+    async with session.get(URL, headers=headers) as response:
+        response.raise_for_status()
+        data = await response.json()
+    return [photo["src"]["large"] for photo in data["photos"]]
+
 
-    data = response.json()
-    for photo in data["photos"]:
-        photo_url = photo["src"]["large"]
-        response_photo = requests.get(photo_url)
-        response_photo.raise_for_status()
-        yield response_photo.content
+async def fetch_image(session: aiohttp.ClientSession, url: str) -> bytes:
+    """Fetch the content of a single image."""
+    async with session.get(url) as response:
+        response.raise_for_status()
+        return await response.read()
 
 
 def process_response(filename: str, content: bytes, to_grayscale: bool = False):
+    if not to_grayscale:
+        # the content is a JPEG already, no need to decode and re-encode it
+        with open(f"{filename}.jpg", "wb") as f:
+            f.write(content)
+        return
+    if turbo_jpeg:
+        image = turbo_jpeg.decode(content, pixel_format=TJPF_GRAY)
+        with open(f"{filename}.jpg", "wb") as f:
+            f.write(
+                turbo_jpeg.encode(
+                    image,
+                    quality=75,
+                    pixel_format=TJPF_GRAY,
+                    jpeg_subsample=TJSAMP_GRAY,
+                )
+            )
+        return
     image = Image.open(io.BytesIO(content))
-    if to_grayscale:
-        image = image.convert("L")
+    image = image.convert("L")
     image.save(f"{filename}.jpg")
 
 
+async def download_image(
+    session: aiohttp.ClientSession,
+    url: str,
+    filename: str,
+    to_grayscale: bool = False,
+):
+    """Download a single image and save it to disk."""
+    content = await fetch_image(session, url)
+    await asyncio.to_thread(process_response, filename, content, to_grayscale)
+
+
+async def download_images(query: str, num: int):
+    """Download num colored and num grayscale images concurrently."""
+    connector = aiohttp.TCPConnector(limit=MAX_CONNECTIONS)
+    async with aiohttp.ClientSession(connector=connector, headers=HEADERS) as session:
+        photo_urls = await fetch_photo_urls(session, query)
+        downloads = []
+        for i, photo_url in enumerate(photo_urls[: num * 2]):
+            use_color = i % 2 == 0
+            folder = "color" if use_color else "grayscale"
+            downloads.append(
+                download_image(
+                    session,
+                    photo_url,
+                    f"images/{query}/{folder}/{i + 1:05}",
+                    to_grayscale=not use_color,
+                )
+            )
+        await asyncio.gather(*downloads)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Download random faces.")
     parser.add_argument("num", help="Number of images", type=int)
@@ -48,14 +109,7 @@ def main():
     os.makedirs(f"images/{query}/color", exist_ok=True)
     os.makedirs(f"images/{query}/grayscale", exist_ok=True)
 
-    for i, content in enumerate(fetch_images(query)):
-        if i == args.num * 2:
-            break
-        use_color = i % 2 == 0
-        folder = "color" if use_color else "grayscale"
-        process_response(
-            f"images/{query}/{folder}/{i + 1:05}", content, to_grayscale=not use_color
-        )
+    asyncio.run(download_images(query, args.num))
 
 
 if __name__ == "__main__":
@@ -1,16 +1,22 @@
 """Script to generate a Gramps family tree database with random data."""
 
+import bisect
+import calendar
 import datetime
+import functools
 import glob
+import gzip
 import os
 import random
-import uuid
-from typing import Optional, Union
+import secrets
+from collections import defaultdict, deque
+from typing import Any, Callable, Iterable, Optional, Union
 
 import faker
 from gramps.gen.db import DbTxn
+from gramps.gen.db.dbconst import DBBACKEND
 from gramps.gen.db.utils import make_database
-from gramps.gen.display.name import NameDisplay
+from gramps.gen.display.name import displayer as name_displayer
 from gramps.gen.lib import (
     ChildRef,
     Date,
@@ -32,6 +38,48 @@ from gramps.gen.user import User
 from gramps.gen.utils.file import create_checksum
 from gramps.plugins.export.exportxml import XmlWriter
 
+# (month, day) pairs for every day of a common year and of a leap year
+_DAYS_OF_YEAR = {
+    is_leap: tuple(
+        (month, day)
+        for month in range(1, 13)
+        for day in range(
+            1, calendar.monthrange(2000 if is_leap else 2001, month)[1] + 1
+        )
+    )
+    for is_leap in (False, True)
+}
+
+_PrimaryObject = Union[Event, Family, Media, Note, Person, Place]
+
+# the database is throwaway until the build is done, so durability is traded
+# for speed
+_DISK_PRAGMAS = (
+    "PRAGMA journal_mode=MEMORY;",
+    "PRAGMA synchronous=OFF;",
+    "PRAGMA locking_mode=EXCLUSIVE;",
+    "PRAGMA temp_store=MEMORY;",
+    "PRAGMA cache_size=-400000;",
+)
+
+# SQLite defaults, which Gramps relies on, restored once the build is done
+_SAFE_PRAGMAS = (
+    "PRAGMA journal_mode=DELETE;",
+    "PRAGMA synchronous=FULL;",
+    "PRAGMA locking_mode=NORMAL;",
+)
+
+_PLACE_TYPES = (
+    PlaceType.CITY,
+    PlaceType.HAMLET,
+    PlaceType.LOCALITY,
+    PlaceType.MUNICIPALITY,
+    PlaceType.VILLAGE,
+    PlaceType.TOWN,
+)
+
+_USER = User()
+
 
 class FakeTree:
     """Fake Gramps tree class."""
@@ -46,79 +94,208 @@ class FakeTree:
     MIN_NOTE_LEN: int = 200
     MAX_NOTE_LEN: int = 2000
     NUM_PLACES: int = 50
-    PROB_PERSON_RELOCATED: int = 0.2
-
-    def __init__(self, locale, country_code: str = "US") -> None:
-        """Inititalize self."""
+    PROB_PERSON_RELOCATED: float = 0.2
+    NAME_POOL_SIZE: int = 2048
+    PLACE_POOL_SIZE: int = 1024
+    CORPUS_SIZE: int = 200_000
+
+    def __init__(
+        self, locale: str, country_code: str = "US", directory: str = ":memory:"
+    ) -> None:
+        """Inititalize self.
+
+        If a directory is given, the tree is built in a SQLite database
+        in that directory, which can be opened as a Gramps family tree.
+        The directory must not contain a database already. Until build()
+        is done, the database is written without crash safety.
+        """
         self.fake = faker.Faker(locale=locale)
         self.country_code = country_code
         self.year_now = datetime.datetime.now().year
+        self._handle_nonce = secrets.token_hex(4)
+        self._handle_counter = 0
         self.db = make_database("sqlite")
-        self.db.load(":memory:")
-        self.places = []
+        self._on_disk = directory != ":memory:"
+        if self._on_disk:
+            if os.path.exists(os.path.join(directory, "sqlite.db")):
+                raise FileExistsError(f"{directory} already contains a database")
+            os.makedirs(directory, exist_ok=True)
+            with open(
+                os.path.join(directory, DBBACKEND), "w", encoding="utf8"
+            ) as backend_file:
+                backend_file.write("sqlite")
+            with open(
+                os.path.join(directory, "name.txt"), "w", encoding="utf8"
+            ) as name_file:
+                name_file.write(os.path.basename(os.path.abspath(directory)))
+        self.db.load(directory)
+        if self._on_disk:
+            for pragma in _DISK_PRAGMAS:
+                self.db.dbapi.execute(pragma)
+        self.places: list[Place] = []
         self.images = set(self._get_images())
-        self.db.set_mediapath(os.path.abspath("."))
-
-    def _get_images(self):
+        self._image_pools = self._get_image_pools(self.images)
+        self._person_name_cache: dict[str, str] = {}
+        self._birth_events: dict[str, Event] = {}
+        if self.images:
+            self.db.set_mediapath(os.path.abspath("."))
+        self._add_methods: dict[type, Callable[..., Any]] = {
+            Event: self.db.add_event,
+            Family: self.db.add_family,
+            Media: self.db.add_media,
+            Note: self.db.add_note,
+            Person: self.db.add_person,
+            Place: self.db.add_place,
+        }
+        self._commit_methods: dict[type, Callable[..., Any]] = {
+            Event: self.db.commit_event,
+            Family: self.db.commit_family,
+            Person: self.db.commit_person,
+        }
+        # objects queued by build(), written once when the tree is complete
+        self._pending: Optional[dict[str, _PrimaryObject]] = None
+
+    # the pools are filled on first use, so that size settings made after
+    # construction still apply
+
+    @functools.cached_property
+    def _male_names(self) -> list[str]:
+        return [self.fake.first_name_male() for _ in range(self.NAME_POOL_SIZE)]
+
+    @functools.cached_property
+    def _female_names(self) -> list[str]:
+        return [self.fake.first_name_female() for _ in range(self.NAME_POOL_SIZE)]
+
+    @functools.cached_property
+    def _surnames(self) -> list[str]:
+        return [self.fake.last_name() for _ in range(self.NAME_POOL_SIZE)]
+
+    @functools.cached_property
+    def _latlngs(self) -> list[tuple[str, ...]]:
+        latlngs = (
+            self.fake.local_latlng(self.country_code)
+            for _ in range(self.PLACE_POOL_SIZE)
+        )
+        return [latlng for latlng in latlngs if latlng]
+
+    @functools.cached_property
+    def _corpus(self) -> str:
+        return self.fake.text(self.CORPUS_SIZE)
+
+    @functools.cached_property
+    def _corpus_starts(self) -> list[int]:
+        """Offsets of the sentence starts in the corpus, in ascending order."""
+        corpus = self._corpus
+        return [0] + [
+            i + 1
+            for i, char in enumerate(corpus)
+            if char in " \n" and corpus[i - 1] == "."
+        ]
+
+    def _get_images(self) -> list[str]:
         """Get a list of images."""
         return glob.glob("**/*.jpg", recursive=True)
 
-    def export(self, filename) -> None:
-        """Export the database to Gramps XML."""
+    @staticmethod
+    def _get_image_pools(images: Iterable[str]) -> dict[tuple[str, str], list[str]]:
+        """Group images by folder and by color or grayscale, in random order."""
+        pools: dict[tuple[str, str], list[str]] = defaultdict(list)
+        for image in sorted(images):
+            parts = os.path.normpath(image).split(os.sep)
+            for i, part in enumerate(parts[1:-1], start=1):
+                if part in ("color", "grayscale"):
+                    pools[(parts[i - 1], part)].append(image)
+                    break
+        for pool in pools.values():
+            random.shuffle(pool)
+        return pools
+
+    def export(self, filename: str, compresslevel: int = 1) -> None:
+        """Export the database to gzip compressed Gramps XML."""
         abs_path = os.path.abspath(filename)
-        user = User()
-        g = XmlWriter(self.db, user, 0, compress=False)
-        g.write(abs_path)
-
-    def build(self):
-        self.add_places()
-        person = self.add_start_person()
-        self.add_family(person, recursive=True)
+        g = XmlWriter(self.db, _USER, 0, compress=False)
+        with open(abs_path, "wb") as f, gzip.GzipFile(
+            fileobj=f, mode="wb", compresslevel=compresslevel
+        ) as gz:
+            g.write_handle(gz)
+
+    def close(self) -> None:
+        """Close the database."""
+        self.db.close()
+
+    def _add(self, obj: _PrimaryObject, msg: str) -> None:
+        """Add an object to the database, or queue it while building."""
+        if self._pending is not None:
+            self._pending[obj.handle] = obj
+            return
+        with DbTxn(msg, self.db) as trans:
+            self._add_methods[type(obj)](obj, trans)
 
-    def random_bool(self, probability: float):
+    def _commit(self, obj: _PrimaryObject, msg: str) -> None:
+        """Commit a changed object, or queue it while building."""
+        if self._pending is not None:
+            self._pending[obj.handle] = obj
+            return
+        with DbTxn(msg, self.db) as trans:
+            self._commit_methods[type(obj)](obj, trans)
+
+    def build(self) -> None:
+        self._pending = {}
+        try:
+            self.add_places()
+            person = self.add_start_person()
+            self.add_family(person, recursive=True)
+            pending = self._pending
+        finally:
+            self._pending = None
+        # every object is written once, in its final state
+        with DbTxn("Build tree", self.db, batch=True) as trans:
+            for obj in pending.values():
+                self._add_methods[type(obj)](obj, trans)
+        if self._on_disk:
+            for pragma in _SAFE_PRAGMAS:
+                self.db.dbapi.execute(pragma)
+
+    def random_bool(self, probability: float) -> bool:
         return random.random() <= probability
 
-    def random_has_parents(self, n_gen: int):
+    def random_has_parents(self, n_gen: int) -> bool:
         probability = 1 - n_gen / self.N_GEN
         return self.random_bool(probability)
 
-    def random_handle(self):
-        return str(uuid.uuid4())
+    def random_handle(self) -> str:
+        self._handle_counter += 1
+        return f"{self._handle_nonce}{self._handle_counter:016x}"
 
-    def random_gender(self):
+    def random_gender(self) -> int:
         return random.choice([Person.MALE, Person.FEMALE])
 
-    def random_date(self, year: int):
-        month, day = self.fake.date("%m-%d").split("-")
-        month = int(month)
-        day = int(day)
+    def random_date(self, year: int) -> Date:
+        month, day = random.choice(_DAYS_OF_YEAR[calendar.isleap(year)])
         date = Date()
         date.set_yr_mon_day(year, month, day)
         return date
 
-    def random_age(self, min_age: int = 0):
+    def random_age(self, min_age: int = 0) -> int:
         return random.randint(min_age or self.MIN_AGE, self.MAX_AGE)
 
-    def random_text(self):
+    def random_text(self) -> str:
         """Generate random text for a note."""
         chars = random.randint(self.MIN_NOTE_LEN, self.MAX_NOTE_LEN)
-        return self.fake.text(chars)
-
-    def random_place(self) -> Place:
-        lat, lng, name, _, _ = self.fake.local_latlng(self.country_code)
+        starts = self._corpus_starts
+        # only sentences that leave room for the whole note
+        n_starts = bisect.bisect_right(starts, len(self._corpus) - chars)
+        start = starts[random.randrange(n_starts)] if n_starts else 0
+        text = self._corpus[start : start + chars]
+        # end on a full sentence like Faker does
+        end = text.rfind(".") + 1
+        return text[:end] if end else text
+
+    def random_place(self, latlng: Optional[tuple[str, ...]] = None) -> Place:
+        lat, lng, name, _, _ = latlng or random.choice(self._latlngs)
         place = Place()
         place.handle = self.random_handle()
-        place_type = random.choice(
-            [
-                PlaceType.CITY,
-                PlaceType.HAMLET,
-                PlaceType.LOCALITY,
-                PlaceType.MUNICIPALITY,
-                PlaceType.VILLAGE,
-                PlaceType.TOWN,
-            ]
-        )
-        place.set_type(PlaceType(place_type))
+        place.set_type(random.choice(_PLACE_TYPES))
         place_name = PlaceName()
         place_name.set_value(name)
         place.set_name(place_name)
@@ -126,15 +303,15 @@ class FakeTree:
         place.set_longitude(lng)
         return place
 
-    def add_random_name(self, person: Person, surname=None):
+    def add_random_name(self, person: Person, surname: Optional[str] = None) -> None:
         """Add a random name to a person object."""
         name = person.primary_name
         if person.gender == Person.MALE:
-            name.first_name = self.fake.first_name_male()
+            name.first_name = random.choice(self._male_names)
         else:
-            name.first_name = self.fake.first_name_female()
+            name.first_name = random.choice(self._female_names)
         _surname = Surname()
-        _surname.surname = surname or self.fake.last_name()
+        _surname.surname = surname or random.choice(self._surnames)
         name.set_surname_list([_surname])
 
     def add_event(
@@ -156,8 +333,7 @@ class FakeTree:
         if place_handle:
             event.place = place_handle
 
-        with DbTxn("Add event", self.db) as trans:
-            self.db.add_event(event, trans)
+        self._add(event, "Add event")
 
         event_ref = EventRef()
         event_ref.ref = event.handle
@@ -165,7 +341,7 @@ class FakeTree:
 
         return event
 
-    def add_note(self, obj):
+    def add_note(self, obj: Union[Event, Person]) -> None:
         """Add a note to an object."""
         note = Note()
         note.handle = self.random_handle()
@@ -173,8 +349,7 @@ class FakeTree:
         styled_text = StyledText(text)
         note.set_styledtext(styled_text)
 
-        with DbTxn("Add note", self.db) as trans:
-            self.db.add_note(note, trans)
+        self._add(note, "Add note")
 
         obj.note_list.append(note.handle)
 
@@ -184,9 +359,9 @@ class FakeTree:
         year_min: int,
         year_max: int,
         place_handle: Optional[str] = None,
-    ):
+    ) -> Event:
         """Add and commit a birth date."""
-        self.add_event(
+        event = self.add_event(
             obj=person,
             event_type=EventType.BIRTH,
             year_min=year_min,
@@ -194,6 +369,8 @@ class FakeTree:
             place_handle=place_handle,
         )
         person.birth_ref_index = len(person.event_ref_list) - 1
+        self._birth_events[person.handle] = event
+        return event
 
     def add_death_date(
         self,
@@ -201,7 +378,7 @@ class FakeTree:
         year_min: int,
         year_max: int,
         place_handle: Optional[str] = None,
-    ):
+    ) -> None:
         """Add and commit a death date."""
         self.add_event(
             obj=person,
@@ -212,23 +389,19 @@ class FakeTree:
         )
         person.death_ref_index = len(person.event_ref_list) - 1
 
-    def add_image(self, obj, folder: str, title: str, color: bool = True):
-        image = ""
-        for candidate_image in self.images:
-            if color and folder in candidate_image and "color" in candidate_image:
-                image = candidate_image
-                break
-            if (
-                not color
-                and folder in candidate_image
-                and "grayscale" in candidate_image
-            ):
-                image = candidate_image
-                break
-        if not image:
+    def add_image(
+        self,
+        obj: Union[Event, Family, Person, Place],
+        folder: str,
+        title: str,
+        color: bool = True,
+    ) -> None:
+        pool = self._image_pools.get((folder, "color" if color else "grayscale"))
+        if not pool:
             return
+        image = pool.pop()
         # remove image from faces since we used it
-        self.images = self.images - {image}
+        self.images.discard(image)
 
         media = Media()
         media.handle = self.random_handle()
@@ -238,35 +411,45 @@ class FakeTree:
         media.set_mime_type("image/jpeg")
         media.set_description(title)
 
-        with DbTxn("Add media object", self.db) as trans:
-            self.db.add_media(media, trans)
+        self._add(media, "Add media object")
 
         media_ref = MediaRef()
         media_ref.set_reference_handle(media.handle)
         obj.add_media_reference(media_ref)
 
-    def add_face(self, person: Person, color: bool = True):
-        name_display = NameDisplay()
-        person_name = name_display.display(person)
+    def display_name(self, person: Person) -> str:
+        """Get the person's display name, cached by handle."""
+        if person.handle not in self._person_name_cache:
+            self._person_name_cache[person.handle] = name_displayer.display(person)
+        return self._person_name_cache[person.handle]
+
+    def add_face(self, person: Person, color: bool = True) -> None:
+        person_name = self.display_name(person)
         return self.add_image(
             obj=person, folder="people", title=person_name, color=color
         )
 
     def add_family_picture(
-        self, family: Family, father: Person, mother: Person, color: bool = True
-    ):
-        name_display = NameDisplay()
-        father_name = name_display.display(father)
-        mother_name = name_display.display(mother)
+        self,
+        family: Family,
+        father: Person,
+        mother: Person,
+        color: bool = True,
+    ) -> None:
+        father_name = self.display_name(father)
+        mother_name = self.display_name(mother)
         title = f"{father_name} & {mother_name}"
         return self.add_image(obj=family, folder="family", title=title, color=color)
 
     def add_wedding_picture(
-        self, event: Event, father: Person, mother: Person, color: bool = True
-    ):
-        name_display = NameDisplay()
-        father_name = name_display.display(father)
-        mother_name = name_display.display(mother)
+        self,
+        event: Event,
+        father: Person,
+        mother: Person,
+        color: bool = True,
+    ) -> None:
+        father_name = self.display_name(father)
+        mother_name = self.display_name(mother)
         title = f"{father_name} & {mother_name}"
         return self.add_image(obj=event, folder="wedding", title=title, color=color)
 
@@ -284,33 +467,65 @@ class FakeTree:
         self.add_note(person)
         self.add_face(person)
 
-        with DbTxn("Add person", self.db) as trans:
-            self.db.add_person(person, trans)
+        self._add(person, "Add person")
 
         self.db.set_default_person_handle(person.handle)
         return person
 
+    def get_birth_event(self, person: Person) -> Event:
+        """Get the person's birth event, without a database lookup if possible."""
+        if person.handle in self._birth_events:
+            return self._birth_events[person.handle]
+        birth_ref = person.get_birth_ref()
+        return self.db.get_event_from_handle(birth_ref.ref)
+
     def get_birth_year(self, person: Person) -> int:
         """Get the person's birth year."""
-        birth_ref = person.get_birth_ref()
-        event = self.db.get_event_from_handle(birth_ref.ref)
-        return event.date.get_year()
+        return self.get_birth_event(person).date.get_year()
 
     def get_birth_place_handle(self, person: Person) -> str:
         """Get the person's birth place."""
-        birth_ref = person.get_birth_ref()
-        event = self.db.get_event_from_handle(birth_ref.ref)
-        return event.place
+        return self.get_birth_event(person).place
+
+    def add_family(
+        self,
+        person: Person,
+        recursive: bool = False,
+        n_gen: int = 0,
+    ) -> None:
+        """Add a family (siblings and parents) to an existing person.
+
+        If recursive, ancestors are added generation by generation.
+        """
+        queue = deque([(person, n_gen)])
+        while queue:
+            person, n_gen = queue.popleft()
+            father, mother = self._add_parent_family(person)
+            if recursive:
+                if self.random_has_parents(n_gen):
+                    queue.append((father, n_gen + 1))
+                if self.random_has_parents(n_gen):
+                    queue.append((mother, n_gen + 1))
+
+    def _add_parent_family(self, person: Person) -> tuple[Person, Person]:
+        """Add the parents and siblings of a person and return the parents."""
+        # bind frequently used attributes to locals
+        rand_bool = self.random_bool
+        rand_handle = self.random_handle
+        rand_age = self.random_age
+        rand_choice = random.choice
+        rand_int = random.randint
+        places = self.places
+        prob_relocated = self.PROB_PERSON_RELOCATED
+        prob_has_note = self.PROB_PERSON_HAS_NOTE
 
-    def add_family(self, person: Person, recursive: bool = False, n_gen: int = 0):
-        """Add a family (siblings and parents) to an existing person."""
         family_surname = person.primary_name.surname_list[0].surname
         birth_year = self.get_birth_year(person)
         birth_place_handle = self.get_birth_place_handle(person)
 
         # family
         family = Family()
-        family.handle = self.random_handle()
+        family.handle = rand_handle()
 
         person.add_parent_family_handle(family.handle)
 
@@ -321,21 +536,24 @@ class FakeTree:
 
         # father
         father = Person()
-        father.handle = self.random_handle()
+        father.handle = rand_handle()
         father.add_family_handle(family.handle)
         father.gender = Person.MALE
         self.add_random_name(father, surname=family_surname)
-        if self.random_bool(self.PROB_PERSON_RELOCATED) and self.places:
-            father_birth_place = random.choice(self.places)
+        if rand_bool(prob_relocated) and places:
+            father_birth_place = rand_choice(places)
             father_birth_place_handle = father_birth_place.handle
         else:
             father_birth_place_handle = birth_place_handle
         self.add_birth_date(
-            father, birth_year - 40, birth_year - 20, father_birth_place_handle
+            father,
+            birth_year - 40,
+            birth_year - 20,
+            father_birth_place_handle,
         )
         family.set_father_handle(father.handle)
         father_birth_year = self.get_birth_year(father)
-        if self.random_bool(self.PROB_PERSON_HAS_NOTE):
+        if rand_bool(prob_has_note):
             self.add_note(father)
         if father_birth_year > 1940:
             self.add_face(father, color=True)
@@ -344,21 +562,24 @@ class FakeTree:
 
         # mother
         mother = Person()
-        mother.handle = self.random_handle()
+        mother.handle = rand_handle()
         mother.add_family_handle(family.handle)
         mother.gender = Person.FEMALE
         self.add_random_name(mother)
         family.set_mother_handle(mother.handle)
-        if self.random_bool(self.PROB_PERSON_RELOCATED) and self.places:
-            mother_birth_place = random.choice(self.places)
+        if rand_bool(prob_relocated) and places:
+            mother_birth_place = rand_choice(places)
             mother_birth_place_handle = mother_birth_place.handle
         else:
             mother_birth_place_handle = birth_place_handle
         self.add_birth_date(
-            mother, birth_year - 40, birth_year - 20, mother_birth_place_handle
+            mother,
+            birth_year - 40,
+            birth_year - 20,
+            mother_birth_place_handle,
         )
         mother_birth_year = self.get_birth_year(mother)
-        if self.random_bool(self.PROB_PERSON_HAS_NOTE):
+        if rand_bool(prob_has_note):
             self.add_note(mother)
 
         if mother_birth_year > 1940:
@@ -366,18 +587,18 @@ class FakeTree:
         elif mother_birth_year > 1860:
             self.add_face(mother, color=False)
 
-        marriage_year = random.randint(
+        marriage_year = rand_int(
             max(father_birth_year, mother_birth_year) + 18, birth_year - 1
         )
-        if not self.random_bool(self.PROB_UNMARRIED):
+        if not rand_bool(self.PROB_UNMARRIED):
             marriage = self.add_event(
                 family, EventType.MARRIAGE, marriage_year, marriage_year
             )
         else:
             marriage = None
 
-        father_age = self.random_age(min_age=marriage_year - father_birth_year + 1)
-        mother_age = self.random_age(min_age=marriage_year - mother_birth_year + 1)
+        father_age = rand_age(min_age=marriage_year - father_birth_year + 1)
+        mother_age = rand_age(min_age=marriage_year - mother_birth_year + 1)
         father_death_year = father_birth_year + father_age
         mother_death_year = mother_birth_year + mother_age
         self.add_death_date(
@@ -396,19 +617,18 @@ class FakeTree:
             if marriage:
                 self.add_wedding_picture(marriage, father, mother, color=True)
 
-        with DbTxn("Add parents", self.db) as trans:
-            self.db.add_person(father, trans)
-            self.db.add_person(mother, trans)
-            self.db.add_family(family, trans)
-            self.db.commit_person(person, trans)
-            if marriage:
-                self.db.commit_event(marriage, trans)
+        self._add(father, "Add parents")
+        self._add(mother, "Add parents")
+        self._add(family, "Add parents")
+        self._commit(person, "Add parents")
+        if marriage:
+            self._commit(marriage, "Add parents")
 
-        n_siblings = random.randint(0, self.MAX_SIBLINGS)
+        n_siblings = rand_int(0, self.MAX_SIBLINGS)
         year = marriage_year + 1
         children = []
         for _ in range(n_siblings):
-            year = year + random.randint(2, 6)
+            year = year + rand_int(2, 6)
             if abs(year - birth_year) < 2:
                 # 2 years difference from main child
                 continue
@@ -420,20 +640,20 @@ class FakeTree:
                 break
             child = Person()
             child.add_parent_family_handle(family.handle)
-            child.handle = self.random_handle()
+            child.handle = rand_handle()
             child.gender = self.random_gender()
             self.add_random_name(child, surname=family_surname)
             self.add_birth_date(child, year, year, birth_place_handle)
-            age = self.random_age()
+            age = rand_age()
             death_year = year + age
             if death_year < self.year_now:
-                if self.random_bool(self.PROB_PERSON_RELOCATED) and self.places:
-                    death_place = random.choice(self.places)
+                if rand_bool(prob_relocated) and places:
+                    death_place = rand_choice(places)
                     death_place_handle = death_place.handle
                 else:
                     death_place_handle = birth_place_handle
                 self.add_death_date(child, death_year, death_year, death_place_handle)
-            if self.random_bool(self.PROB_PERSON_HAS_NOTE):
+            if rand_bool(prob_has_note):
                 self.add_note(child)
 
             children.append(child)
@@ -443,28 +663,23 @@ class FakeTree:
             child_ref.ref = child.handle
             family.child_ref_list.append(child_ref)
 
-            with DbTxn("Add children", self.db) as trans:
-                for child in children:
-                    self.db.add_person(child, trans)
-                self.db.commit_family(family, trans)
+        if children:
+            for child in children:
+                self._add(child, "Add children")
+            self._commit(family, "Add children")
 
-        if recursive:
-            if self.random_has_parents(n_gen):
-                self.add_family(father, recursive=True, n_gen=n_gen + 1)
-            if self.random_has_parents(n_gen):
-                self.add_family(mother, recursive=True, n_gen=n_gen + 1)
+        return father, mother
 
-    def add_places(self):
-        for _ in range(self.NUM_PLACES):
-            place = self.random_place()
+    def add_places(self) -> None:
+        for latlng in random.choices(self._latlngs, k=self.NUM_PLACES):
+            place = self.random_place(latlng)
             colored = bool(random.randint(0, 1))
             self.places.append(place)
             self.add_image(place, "town", str(place.name.value), color=colored)
-            with DbTxn("Add place", self.db) as trans:
-                self.db.add_place(place, trans)
+            self._add(place, "Add place")
 
 
-def main():
+def main() -> None:
     """Main function."""
     tree = FakeTree(locale="de", country_code="DE")
     tree.N_GEN = 9
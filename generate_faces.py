@@ -1,23 +1,78 @@
 """Download images from thispersondoesnotexist.com."""
 
 import argparse
+import asyncio
 import io
 import os
 
-import requests
+import aiohttp
 from PIL import Image
 
+try:
+    from turbojpeg import TJPF_GRAY, TJSAMP_GRAY, TurboJPEG
+
+    turbo_jpeg = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    # PyTurboJPEG or the libjpeg-turbo library is not available
+    turbo_jpeg = None
+
 URL = "https://thispersondoesnotexist.com"
 HEADERS = {"User-Agent": "Gramps Faker 1.0"}
+MAX_CONNECTIONS = 16
 
 
 def process_response(filename: str, content: bytes, to_grayscale: bool = False):
+    if not to_grayscale:
+        # the content is a JPEG already, no need to decode and re-encode it
+        with open(f"{filename}.jpg", "wb") as f:
+            f.write(content)
+        return
+    if turbo_jpeg:
+        image = turbo_jpeg.decode(content, pixel_format=TJPF_GRAY)
+        with open(f"{filename}.jpg", "wb") as f:
+            f.write(
+                turbo_jpeg.encode(
+                    image,
+                    quality=75,
+                    pixel_format=TJPF_GRAY,
+                    jpeg_subsample=TJSAMP_GRAY,
+                )
+            )
+        return
     image = Image.open(io.BytesIO(content))
-    if to_grayscale:
-        image = image.convert("L")
+    image = image.convert("L")
     image.save(f"{filename}.jpg")
 
 
+async def download_face(
+    session: aiohttp.ClientSession, filename: str, to_grayscale: bool = False
+):
+    """Download a single face and save it to disk."""
+    async with session.get(URL) as response:
+        response.raise_for_status()
+        content = await response.read()
+    await asyncio.to_thread(process_response, filename, content, to_grayscale)
+
+
+async def download_faces(num: int):
+    """Download num colored and num grayscale faces concurrently."""
+    connector = aiohttp.TCPConnector(limit=MAX_CONNECTIONS)
+    async with aiohttp.ClientSession(connector=connector, headers=HEADERS) as session:
+        downloads = []
+        for i in range(num):
+            downloads.append(
+                download_face(
+                    session, f"images/people/color/{i + 1:05}", to_grayscale=False
+                )
+            )
+            downloads.append(
+                download_face(
+                    session, f"images/people/grayscale/{i + 1:05}", to_grayscale=True
+                )
+            )
+        await asyncio.gather(*downloads)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Download random faces.")
     parser.add_argument("num", help="Number of faces", type=int)
@@ -26,13 +81,7 @@ def main():
     os.makedirs("images/people/color", exist_ok=True)
     os.makedirs("images/people/grayscale", exist_ok=True)
 
-    for i in range(args.num):
-        content = requests.get(URL, headers=HEADERS).content
-        process_response(f"images/people/color/{i + 1:05}", content, to_grayscale=False)
-        content = requests.get(URL, headers=HEADERS).content
-        process_response(
-            f"images/people/grayscale/{i + 1:05}", content, to_grayscale=True
-        )
+    asyncio.run(download_faces(args.num))
 
 
 if __name__ == "__main__":
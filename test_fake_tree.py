@@ -1,7 +1,45 @@
 """Unit tests for fake_tree."""
 
-from fake_tree import main
+import gzip
 
+import pytest
+from gramps.gen.db.utils import make_database
 
-def test_main():
-    main()
\ No newline at end of file
+from fake_tree import FakeTree, main
+
+
+def test_main(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    main()
+    assert (tmp_path / "random_tree.gramps").exists()
+
+
+@pytest.mark.parametrize("compresslevel", [1, 9])
+def test_export(tmp_path, compresslevel):
+    tree = FakeTree(locale="de", country_code="DE")
+    tree.N_GEN = 3
+    tree.build()
+    filename = tmp_path / "tree.gramps"
+    tree.export(str(filename), compresslevel=compresslevel)
+    with gzip.open(filename) as f:
+        head = f.read(200)
+    assert head.startswith(b'<?xml version="1.0" encoding="UTF-8"?>')
+    assert b"<!DOCTYPE database PUBLIC \"-//Gramps//DTD Gramps XML" in head
+
+
+def test_directory(tmp_path):
+    tree = FakeTree(locale="de", country_code="DE", directory=str(tmp_path))
+    tree.N_GEN = 4
+    tree.build()
+    n_people = tree.db.get_number_of_people()
+    tree.db.dbapi.execute("PRAGMA synchronous")
+    assert tree.db.dbapi.fetchone() == (2,)
+    tree.db.dbapi.execute("PRAGMA journal_mode")
+    assert tree.db.dbapi.fetchone() == ("delete",)
+    tree.close()
+    db = make_database("sqlite")
+    db.load(str(tmp_path))
+    assert db.get_number_of_people() == n_people
+    db.close()
+    with pytest.raises(FileExistsError):
+        FakeTree(locale="de", country_code="DE", directory=str(tmp_path))